@@ -10,12 +10,32 @@ Usage:
 """
 
 import argparse
+import glob
+import gzip
+import json
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import sys
+from collections import Counter
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import threading
+import queue
+import sqlite3
+
+try:
+    import orjson  # Optional: faster JSON encoding/decoding
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # Optional: HTTP/2 for Omi uploads (pip install "httpx[http2]")
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+except ImportError:
+    httpx = None
 
 # =============================================================================
 # API CONFIGURATION - Enter your API keys here
@@ -31,14 +51,22 @@ OMI_API_KEY = ""
 LIMITLESS_BASE_URL = "https://api.limitless.ai"
 OMI_BASE_URL = "https://api.omi.me/v1/dev"
 
+LIMITLESS_PAGE_SIZE = 10  # Limitless API maximum lifelogs per page
+
 # Rate limiting config
+LIMITLESS_REQUESTS_PER_MINUTE = 180
 OMI_REQUESTS_PER_MINUTE = 100
 OMI_MIN_DELAY = 60.0 / OMI_REQUESTS_PER_MINUTE  # 0.6s minimum between requests
 DEFAULT_WORKERS = 3  # Number of parallel workers
+DEFAULT_BURST = 10  # Max requests that may be sent back-to-back
 OMI_MAX_SEGMENTS = 500  # Omi API limit per conversation
+HTTP_RETRIES = 3  # Retries for transient HTTP errors (429/5xx)
+DEFAULT_STATE_FILE = "import_state.sqlite"  # Local record of imported lifelogs
+DEFAULT_CACHE_DIR = "cache"  # Per-date copies of fetched lifelogs
+MAX_DAYS_BACK = 3650  # How far back to search for the earliest lifelog (10 years)
 
 
-def prompt_for_api_keys():
+def prompt_for_api_keys(need_limitless=True):
     """Interactively prompt user for API keys if not configured"""
     global LIMITLESS_API_KEY, OMI_API_KEY
 
@@ -47,7 +75,7 @@ def prompt_for_api_keys():
     print("=" * 60)
     print("\nAPI keys not configured. Let's set them up.\n")
 
-    if not LIMITLESS_API_KEY:
+    if need_limitless and not LIMITLESS_API_KEY:
         print("1. Limitless API Key")
         print("   Get yours from: https://limitless.ai/developers")
         LIMITLESS_API_KEY = input("   Enter your Limitless API key: ").strip()
@@ -72,12 +100,176 @@ def prompt_for_api_keys():
     print("     add your keys in the API CONFIGURATION section at the top.\n")
 
 
+def json_loads(data):
+    """Decode JSON bytes (uses orjson when installed)"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def json_dumps(obj):
+    """Encode an object as JSON bytes (uses orjson when installed)"""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode("utf-8")
+
+
+def create_session(headers, pool_size=DEFAULT_WORKERS):
+    """Create a requests session with pooled keep-alive connections and retries"""
+    session = requests.Session()
+    session.headers.update(headers)
+
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[429, 502, 503, 504],
+        raise_on_status=False  # Return the last response so callers can check it
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size * 2, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_http2_client(headers, pool_size=DEFAULT_WORKERS):
+    """Create an httpx client that multiplexes requests over HTTP/2 connections"""
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    transport = httpx.HTTPTransport(http2=True, limits=limits, retries=HTTP_RETRIES)
+    # No timeout, matching the requests session: creating a conversation can be slow
+    return httpx.Client(http2=True, headers=headers, transport=transport, timeout=None)
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter (allows short bursts)"""
+
+    def __init__(self, requests_per_minute, capacity=DEFAULT_BURST):
+        self._lock = threading.Lock()
+        self._rate = requests_per_minute / 60.0  # Tokens refilled per second
+        self._capacity = max(1, capacity)
+        self._tokens = float(self._capacity)
+        self._last_refill = time.monotonic()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._last_refill) * self._rate
+                self._tokens = min(self._capacity, self._tokens + refill)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+
+            # Sleep outside the lock so other workers can check the bucket
+            time.sleep(wait)
+
+
+class IncompleteFetchError(Exception):
+    """A page of lifelogs could not be fetched, so the date is incomplete"""
+
+
+class LifelogCache:
+    """Per-date gzipped JSONL copies of fetched lifelogs, for replaying imports.
+
+    Can stand in for LimitlessClient as the lifelog source (see --from-cache).
+    """
+
+    TIMEZONE_FILE = "timezone.txt"  # Date boundaries depend on the timezone used to fetch
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, timezone="America/Los_Angeles"):
+        self.directory = directory
+        self.timezone = timezone
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Nothing to release (kept for parity with LimitlessClient)"""
+
+    def path(self, date):
+        return os.path.join(self.directory, f"{date}.jsonl.gz")
+
+    def saved_timezone(self):
+        """Timezone the cached dates were fetched with (None if nothing has been saved)"""
+        try:
+            with open(os.path.join(self.directory, self.TIMEZONE_FILE)) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def write_through(self, date, lifelogs):
+        """Yield lifelogs while saving them; the date's file only appears once complete"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.saved_timezone() is None:
+            with open(os.path.join(self.directory, self.TIMEZONE_FILE), "w") as f:
+                f.write(self.timezone + "\n")
+
+        path = self.path(date)
+        tmp_path = path + ".tmp"
+        complete = False
+
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=1) as f:
+                for log in lifelogs:
+                    f.write(json_dumps(log) + b"\n")
+                    yield log
+            complete = True
+        except IncompleteFetchError:
+            # Keep what was fetched for this run, but never cache a partial date
+            print(f"\n    Warning: could not fetch all lifelogs for {date}; not cached")
+        finally:
+            if complete:
+                os.replace(tmp_path, path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def dates(self):
+        """Dates with cached lifelogs, oldest first"""
+        suffix = ".jsonl.gz"
+        return sorted(os.path.basename(path)[:-len(suffix)] for path in glob.glob(self.path("*")))
+
+    def get_date_range(self, timezone=None):
+        """Earliest and latest cached dates"""
+        dates = self.dates()
+        if not dates:
+            return None, None
+        return dates[0], dates[-1]
+
+    def iter_lifelogs(self, date=None, **kwargs):
+        """Yield the cached lifelogs for a date"""
+        path = self.path(date)
+        if not os.path.exists(path):
+            return
+
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                yield json_loads(line)
+
+    def fetch_all_lifelogs(self, date=None, **kwargs):
+        """Load all cached lifelogs for a date"""
+        return list(self.iter_lifelogs(date=date))
+
+
 class LimitlessClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, pool_size=DEFAULT_WORKERS, cache=None):
         self.api_key = api_key
         self.headers = {"X-API-Key": api_key}
+        self.session = create_session(self.headers, pool_size)
+        self.cache = cache  # Optional LifelogCache that fetched dates are saved to
+        self._limiter = TokenBucket(LIMITLESS_REQUESTS_PER_MINUTE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
 
-    def fetch_lifelogs(self, date=None, limit=10, cursor=None, timezone="America/Los_Angeles", include_contents=True):
+    def fetch_lifelogs(self, date=None, limit=LIMITLESS_PAGE_SIZE, cursor=None, timezone="America/Los_Angeles", include_contents=True, direction=None):
         """Fetch lifelogs from Limitless API"""
         params = {
             "limit": limit,
@@ -89,33 +281,48 @@ class LimitlessClient:
             params["date"] = date
         if cursor:
             params["cursor"] = cursor
+        if direction:
+            params["direction"] = direction  # "asc" or "desc" (API default)
 
-        response = requests.get(
+        self._limiter.acquire()
+        response = self.session.get(
             f"{LIMITLESS_BASE_URL}/v1/lifelogs",
-            headers=self.headers,
             params=params
         )
 
         if response.ok:
-            return response.json()
+            return json_loads(response.content)
         else:
             return None
 
-    def fetch_all_lifelogs(self, date=None, timezone="America/Los_Angeles", include_contents=True, quiet=False):
+    def fetch_all_lifelogs(self, date=None, timezone="America/Los_Angeles", include_contents=True, quiet=False, page_size=LIMITLESS_PAGE_SIZE):
         """Fetch all lifelogs with pagination"""
-        all_lifelogs = []
+        return list(self.iter_lifelogs(date=date, timezone=timezone, include_contents=include_contents, quiet=quiet, page_size=page_size))
+
+    def iter_lifelogs(self, date=None, timezone="America/Los_Angeles", include_contents=True, quiet=False, page_size=LIMITLESS_PAGE_SIZE):
+        """Yield lifelogs page by page as they arrive (saving full dates to the cache if set)"""
+        if self.cache is not None and date and include_contents:
+            # Strict so a failed page stops the date from being cached
+            lifelogs = self._iter_pages(date, timezone, include_contents, quiet, page_size, strict=True)
+            return self.cache.write_through(date, lifelogs)
+        return self._iter_pages(date, timezone, include_contents, quiet, page_size)
+
+    def _iter_pages(self, date, timezone, include_contents, quiet, page_size, strict=False):
+        """Yield lifelogs page by page; a failed page ends the stream, or raises when strict"""
         cursor = None
         page = 1
 
         while True:
             if not quiet:
                 print(f"    Fetching page {page}...", end="\r")
-            result = self.fetch_lifelogs(date=date, limit=10, cursor=cursor, timezone=timezone, include_contents=include_contents)
+            result = self.fetch_lifelogs(date=date, limit=page_size, cursor=cursor, timezone=timezone, include_contents=include_contents)
             if not result:
+                if strict:
+                    raise IncompleteFetchError(f"Failed to fetch page {page} for {date}")
                 break
 
             lifelogs = result.get("data", {}).get("lifelogs", [])
-            all_lifelogs.extend(lifelogs)
+            yield from lifelogs
 
             # Check for next page
             next_cursor = result.get("meta", {}).get("lifelogs", {}).get("nextCursor")
@@ -124,12 +331,13 @@ class LimitlessClient:
             cursor = next_cursor
             page += 1
 
-            # Small delay to respect rate limits
-            time.sleep(0.3)
-
         if not quiet:
             print(" " * 40, end="\r")  # Clear the line
-        return all_lifelogs
+
+    def _has_lifelogs(self, date, timezone):
+        """Check whether any lifelog exists on the given date"""
+        result = self.fetch_lifelogs(date=date, limit=1, timezone=timezone, include_contents=False)
+        return bool(result and result.get("data", {}).get("lifelogs"))
 
     def get_date_range(self, timezone="America/Los_Angeles"):
         """Find the earliest and latest dates with lifelogs"""
@@ -141,95 +349,144 @@ class LimitlessClient:
         latest = result["data"]["lifelogs"][0]
         latest_date = latest.get("startTime", "")[:10]
 
-        # Binary search for earliest date (go back in time)
-        earliest_date = latest_date
+        # Ask for the oldest lifelog directly: one request instead of probing dates
+        result = self.fetch_lifelogs(limit=1, timezone=timezone, include_contents=False, direction="asc")
+        if result and result.get("data", {}).get("lifelogs"):
+            oldest_date = result["data"]["lifelogs"][0].get("startTime", "")[:10]
+            if oldest_date and oldest_date < latest_date:
+                return oldest_date, latest_date
+
+        return self._search_earliest_date(latest_date, timezone), latest_date
+
+    def _search_earliest_date(self, latest_date, timezone):
+        """Find the earliest date with lifelogs by probing individual dates"""
+        # Double the jump back in time until we hit a date with no data
+        latest_day = datetime.strptime(latest_date, "%Y-%m-%d").date()
+        found = latest_day
+        empty = None
         days_back = 1
 
-        while days_back < 365:  # Max 1 year back
-            check_date = (datetime.strptime(latest_date, "%Y-%m-%d") - timedelta(days=days_back)).strftime("%Y-%m-%d")
-            result = self.fetch_lifelogs(date=check_date, limit=1, timezone=timezone, include_contents=False)
+        while days_back < MAX_DAYS_BACK:
+            check_day = latest_day - timedelta(days=days_back)
 
-            if result and result.get("data", {}).get("lifelogs"):
-                earliest_date = check_date
+            if self._has_lifelogs(check_day.isoformat(), timezone):
+                found = check_day
                 days_back *= 2  # Double the jump
             else:
-                # No data at this date, start narrowing down
+                empty = check_day
                 break
 
-            time.sleep(0.2)
-
-        # Now find the actual earliest by checking dates more carefully
-        # Go back from earliest_date until we find no data
-        current = datetime.strptime(earliest_date, "%Y-%m-%d")
-        while True:
-            check_date = (current - timedelta(days=1)).strftime("%Y-%m-%d")
-            result = self.fetch_lifelogs(date=check_date, limit=1, timezone=timezone, include_contents=False)
-
-            if result and result.get("data", {}).get("lifelogs"):
-                earliest_date = check_date
-                current = current - timedelta(days=1)
+        if empty is None:
+            # Doubling stopped short of the cap: probe the cap itself so the range isn't truncated
+            cap_day = latest_day - timedelta(days=MAX_DAYS_BACK)
+            if self._has_lifelogs(cap_day.isoformat(), timezone):
+                print(f"    Warning: lifelogs go back more than {MAX_DAYS_BACK} days; starting at {cap_day}")
+                return cap_day.isoformat()
+            empty = cap_day
+
+        # Binary search between the last date with data and the first date without
+        while (found - empty).days > 1:
+            mid = empty + timedelta(days=(found - empty).days // 2)
+            if self._has_lifelogs(mid.isoformat(), timezone):
+                found = mid
             else:
-                break
-
-            time.sleep(0.2)
+                empty = mid
 
-        return earliest_date, latest_date
+        return found.isoformat()
 
 
 class OmiClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, pool_size=DEFAULT_WORKERS, burst=DEFAULT_BURST, http2=False):
         self.api_key = api_key
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        self._lock = threading.Lock()
-        self._last_request_time = 0
+        self.http2 = http2
+        if http2:
+            self.session = create_http2_client(self.headers, pool_size)
+        else:
+            self.session = create_session(self.headers, pool_size)
+        self._limiter = TokenBucket(OMI_REQUESTS_PER_MINUTE, capacity=burst)
 
-    def _rate_limit(self):
-        """Ensure we don't exceed rate limits"""
-        with self._lock:
-            now = time.time()
-            elapsed = now - self._last_request_time
-            if elapsed < OMI_MIN_DELAY:
-                time.sleep(OMI_MIN_DELAY - elapsed)
-            self._last_request_time = time.time()
+    def __enter__(self):
+        return self
 
-    def create_conversation(self, payload):
-        """Create a conversation in Omi using from-segments endpoint"""
-        self._rate_limit()
+    def __exit__(self, *exc_info):
+        self.close()
 
-        response = requests.post(
-            f"{OMI_BASE_URL}/user/conversations/from-segments",
-            headers=self.headers,
-            json=payload
-        )
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
 
-        if response.ok:
-            return response.json()
+    def create_conversation(self, payload):
+        """Create a conversation in Omi using from-segments endpoint"""
+        self._limiter.acquire()
+
+        url = f"{OMI_BASE_URL}/user/conversations/from-segments"
+        # Network errors count as a failed upload rather than aborting the import
+        if self.http2:
+            try:
+                response = self.session.post(url, content=json_dumps(payload))
+            except httpx.TransportError:
+                return None
+        else:
+            try:
+                response = self.session.post(url, data=json_dumps(payload))
+            except requests.RequestException:
+                return None
+
+        # Same check as requests' response.ok, which httpx responses lack
+        if response.status_code < 400:
+            return json_loads(response.content)
         else:
             return None
 
     def get_conversations(self, limit=100):
         """Get existing conversations for deduplication"""
-        response = requests.get(
+        response = self.session.get(
             f"{OMI_BASE_URL}/user/conversations",
-            headers=self.headers,
             params={"limit": limit}
         )
 
-        if response.ok:
-            return response.json()
+        if response.status_code < 400:
+            return json_loads(response.content)
         return []
 
 
+class ImportState:
+    """Local SQLite record of lifelogs already imported to Omi, so re-runs skip them"""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS imported (lifelog_id TEXT PRIMARY KEY, omi_ids TEXT, ts INTEGER)"
+        )
+        self.imported = {row[0] for row in self.conn.execute("SELECT lifelog_id FROM imported")}
+
+    def __contains__(self, lifelog_id):
+        return lifelog_id in self.imported
+
+    def record(self, lifelog_id, omi_ids):
+        """Remember a fully imported lifelog and the Omi conversations created for it"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO imported (lifelog_id, omi_ids, ts) VALUES (?, ?, ?)",
+            (lifelog_id, json.dumps(omi_ids), int(time.time()))
+        )
+        self.conn.commit()
+        self.imported.add(lifelog_id)
+
+    def close(self):
+        self.conn.close()
+
+
 def convert_lifelog_to_omi(lifelog):
     """Convert a Limitless lifelog to Omi conversation format (from-segments)"""
     segments = []
-    speaker_map = {}  # Map speaker names to SPEAKER_XX format
+    speaker_map = {}  # Map speaker names to (SPEAKER_XX, speaker_id)
     speaker_counter = 0
 
-    for content in lifelog.get("contents", []):
+    for content in lifelog.get("contents", ()):
         # Only include blockquote type (actual transcript, not AI summaries)
         if content.get("type") != "blockquote":
             continue
@@ -241,12 +498,12 @@ def convert_lifelog_to_omi(lifelog):
         speaker_name = content.get("speakerName", "Unknown")
 
         # Map all speakers to SPEAKER_XX format
-        if speaker_name not in speaker_map:
-            speaker_map[speaker_name] = f"SPEAKER_{speaker_counter:02d}"
+        speaker_entry = speaker_map.get(speaker_name)
+        if speaker_entry is None:
+            speaker_entry = speaker_map[speaker_name] = (f"SPEAKER_{speaker_counter:02d}", speaker_counter)
             speaker_counter += 1
 
-        speaker = speaker_map[speaker_name]
-        speaker_id = list(speaker_map.keys()).index(speaker_name)
+        speaker, speaker_id = speaker_entry
 
         segments.append({
             "text": text,
@@ -274,18 +531,57 @@ def print_progress_bar(current, total, prefix="", suffix="", length=40):
     print(f"\r{prefix} |{bar}| {percent:5.1f}% {suffix}", end="", flush=True)
 
 
+class ProgressPrinter:
+    """Progress output throttled to at most one redraw per interval"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self._last_print = 0
+        self._pending = None
+
+    def update(self, current, total=None, prefix="", suffix=""):
+        """Show progress; a bar when total is known, otherwise a counter"""
+        now = time.monotonic()
+        if current != total and now - self._last_print < self.interval:
+            self._pending = (current, total, prefix, suffix)
+            return
+
+        self._last_print = now
+        self._pending = None
+        self._draw(current, total, prefix, suffix)
+
+    def flush(self):
+        """Draw the latest skipped update, if any"""
+        if self._pending:
+            self._draw(*self._pending)
+            self._pending = None
+
+    def _draw(self, current, total, prefix, suffix):
+        if total:
+            print_progress_bar(current, total, prefix=prefix, suffix=suffix)
+        else:
+            print(f"\r{prefix} {current:>5} {suffix}", end="", flush=True)
+
+
+def print_date_counts(dates):
+    """Print the number of lifelogs per date"""
+    if dates:
+        print(f"\n    By date:")
+        for date, count in sorted(dates.items()):
+            print(f"      {date}: {count} lifelogs")
+
+
 def analyze_lifelogs(lifelogs):
     """Analyze lifelogs and return statistics"""
     total_segments = 0
     empty_count = 0
     oversized_count = 0  # Lifelogs that will be split
     extra_conversations = 0  # Additional conversations from splits
-    date_range = {}
+    date_range = Counter()
 
     for log in lifelogs:
         # Count blockquote segments only
-        blockquotes = [c for c in log.get("contents", []) if c.get("type") == "blockquote"]
-        segment_count = len(blockquotes)
+        segment_count = sum(1 for c in log.get("contents", ()) if c.get("type") == "blockquote")
         total_segments += segment_count
 
         if segment_count == 0:
@@ -299,8 +595,6 @@ def analyze_lifelogs(lifelogs):
         # Track by date
         start_time = log.get("startTime", "")[:10]
         if start_time:
-            if start_time not in date_range:
-                date_range[start_time] = 0
             date_range[start_time] += 1
 
     importable = len(lifelogs) - empty_count
@@ -324,51 +618,38 @@ def split_payload_if_needed(omi_payload):
     if len(segments) <= OMI_MAX_SEGMENTS:
         return [omi_payload]
 
-    # Split into chunks of OMI_MAX_SEGMENTS
-    payloads = []
-    for i in range(0, len(segments), OMI_MAX_SEGMENTS):
-        chunk = segments[i:i + OMI_MAX_SEGMENTS]
-
-        payloads.append({
-            "transcript_segments": chunk,
-            "started_at": omi_payload["started_at"],  # Keep original timestamps
-            "finished_at": omi_payload["finished_at"],
-            "source": omi_payload["source"],
-            "language": omi_payload["language"]
-        })
+    # Split into chunks of OMI_MAX_SEGMENTS, sharing the original metadata (timestamps etc.)
+    base = {key: value for key, value in omi_payload.items() if key != "transcript_segments"}
+    return [
+        {**base, "transcript_segments": segments[i:i + OMI_MAX_SEGMENTS]}
+        for i in range(0, len(segments), OMI_MAX_SEGMENTS)
+    ]
 
-    return payloads
 
+def prepare_import(index, log, state=None):
+    """Convert a lifelog into Omi payloads ready for upload.
 
-def import_single_lifelog(args):
-    """Import a single lifelog to Omi (for parallel processing)"""
-    index, log, omi_client = args
+    Payloads are an empty list if there is nothing to import, or None if the
+    lifelog was already imported on a previous run.
+    """
+    lifelog_id = log.get("id")
     title = log.get('title', 'Untitled')[:30]
 
+    if state is not None and lifelog_id in state:
+        return (index, lifelog_id, title, None)
+
     omi_payload = convert_lifelog_to_omi(log)
 
     # Skip empty conversations
     if not omi_payload["transcript_segments"]:
-        return (index, "skipped", title, 0)
+        return (index, lifelog_id, title, [])
 
     # Split if needed (Omi has 500 segment limit)
-    payloads = split_payload_if_needed(omi_payload)
-
-    success_count = 0
-    for payload in payloads:
-        result = omi_client.create_conversation(payload)
-        if result:
-            success_count += 1
-
-    if success_count == len(payloads):
-        return (index, "success", title, len(payloads))
-    elif success_count > 0:
-        return (index, "partial", title, success_count)
-    else:
-        return (index, "failed", title, 0)
+    return (index, lifelog_id, title, split_payload_if_needed(omi_payload))
 
 
-def main():
+def parse_args():
+    """Parse command line arguments"""
     parser = argparse.ArgumentParser(
         description="Migrate Limitless lifelogs to Omi conversations",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -386,6 +667,9 @@ Examples:
   python3 limitless_to_omi.py --date 2025-12-05 --dry-run
       Preview what would be imported without making changes
 
+  python3 limitless_to_omi.py --all --stream
+      Start uploading to Omi while lifelogs are still being fetched
+
 API Keys:
   You can either:
   1. Edit this script and add your keys in the API CONFIGURATION section
@@ -399,22 +683,41 @@ API Keys:
     parser.add_argument("--limit", type=int, default=3, help="Max lifelogs to fetch (default: 3)")
     parser.add_argument("--dry-run", action="store_true", help="Preview without uploading to Omi")
     parser.add_argument("--yes", "-y", action="store_true", help="Skip confirmation prompt")
+    parser.add_argument("--count-only", action="store_true", help="Only count lifelogs per date (skips transcripts, no upload)")
+    parser.add_argument("--stream", action="store_true", help="Upload while fetching (skips the analysis summary)")
     parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Number of parallel workers (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help=f"Max back-to-back Omi requests before rate limiting kicks in (default: {DEFAULT_BURST})")
+    parser.add_argument("--http2", action="store_true", help="Multiplex Omi uploads over HTTP/2 (requires httpx[http2])")
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE, help=f"Where to record imported lifelogs so re-runs skip them (default: {DEFAULT_STATE_FILE})")
+    parser.add_argument("--no-state", action="store_true", help="Don't skip or record previously imported lifelogs")
+    parser.add_argument("--save-cache", action="store_true", help="Save fetched lifelogs to --cache-dir for later --from-cache runs")
+    parser.add_argument("--from-cache", action="store_true", help="Read lifelogs from --cache-dir instead of the Limitless API")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Directory for per-date lifelog files (default: {DEFAULT_CACHE_DIR})")
     parser.add_argument("--timezone", default="America/Los_Angeles", help="Timezone for date filtering")
     args = parser.parse_args()
 
-    # Check if API keys are configured, prompt if not
-    if not LIMITLESS_API_KEY or not OMI_API_KEY:
-        prompt_for_api_keys()
+    if args.stream and not (args.all or args.from_date or args.date):
+        parser.error("--stream requires --date, --from-date or --all")
+    if args.from_cache and not (args.all or args.from_date or args.date):
+        parser.error("--from-cache requires --date, --from-date or --all")
+    if args.save_cache and not (args.all or args.from_date or args.date):
+        parser.error("--save-cache requires --date, --from-date or --all")
+    if args.save_cache and (args.from_cache or args.count_only):
+        parser.error("--save-cache cannot be combined with --from-cache or --count-only")
+    if args.http2 and httpx is None:
+        parser.error("--http2 requires httpx with HTTP/2 support: pip install \"httpx[http2]\"")
+    if args.stream and (args.dry_run or args.count_only):
+        parser.error("--stream cannot be combined with --dry-run or --count-only")
+
+    return args
+
 
+def run_migration(args, limitless, omi, state=None):
+    """Run the migration steps using the given API clients and import state"""
     print("=" * 60)
     print("Limitless to Omi Migration")
     print("=" * 60)
 
-    # Initialize clients
-    limitless = LimitlessClient(LIMITLESS_API_KEY)
-    omi = OmiClient(OMI_API_KEY)
-
     # Step 1: Analyze available data
     print("\n[1] Analyzing Limitless data...")
 
@@ -434,36 +737,53 @@ API Keys:
 
         print(f"    Import range: {start_date} to {end_date}")
 
-    # Step 2: Fetch lifelogs
+    # Step 2: Fetch lifelogs (metadata only when just counting)
     print("\n[2] Fetching lifelogs from Limitless...")
+    include_contents = not args.count_only
 
     if args.all or args.from_date:
         # Fetch all dates in range
-        all_lifelogs = []
-        current_date = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        dates_to_fetch = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
 
-        dates_to_fetch = []
-        while current_date <= end:
-            dates_to_fetch.append(current_date.strftime("%Y-%m-%d"))
-            current_date += timedelta(days=1)
+    elif args.date:
+        print(f"    Date: {args.date}")
+        dates_to_fetch = [args.date]
+
+    if args.stream:
+        stream_import(args, limitless, omi, dates_to_fetch, state)
+        return
 
+    if args.all or args.from_date:
         print(f"    Fetching {len(dates_to_fetch)} days of data...")
+        all_lifelogs = []
+
+        # Dates are independent, so fetch them in parallel (the client rate-limits)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(limitless.fetch_all_lifelogs, date=date, timezone=args.timezone, include_contents=include_contents, quiet=True): date
+                for date in dates_to_fetch
+            }
+
+            day_results = {}
+            progress = ProgressPrinter()
+            for i, future in enumerate(as_completed(futures)):
+                date = futures[future]
+                day_results[date] = future.result()
+                progress.update(i + 1, len(dates_to_fetch), prefix="    Fetching", suffix=f"({date})")
 
-        for i, date in enumerate(dates_to_fetch):
-            print_progress_bar(i + 1, len(dates_to_fetch), prefix="    Fetching", suffix=f"({date})")
-            day_lifelogs = limitless.fetch_all_lifelogs(date=date, timezone=args.timezone, quiet=True)
-            all_lifelogs.extend(day_lifelogs)
-            time.sleep(0.2)
+        # Keep lifelogs in chronological date order regardless of completion order
+        for date in dates_to_fetch:
+            all_lifelogs.extend(day_results[date])
 
         print()  # New line after progress bar
         lifelogs = all_lifelogs
 
     elif args.date:
-        print(f"    Date: {args.date}")
-        lifelogs = limitless.fetch_all_lifelogs(date=args.date, timezone=args.timezone)
+        lifelogs = limitless.fetch_all_lifelogs(date=args.date, timezone=args.timezone, include_contents=include_contents)
     else:
-        result = limitless.fetch_lifelogs(limit=args.limit, timezone=args.timezone)
+        result = limitless.fetch_lifelogs(limit=args.limit, timezone=args.timezone, include_contents=include_contents)
         if not result:
             print("    Failed to fetch lifelogs")
             return
@@ -473,28 +793,46 @@ API Keys:
         print("    No lifelogs found")
         return
 
+    if args.count_only:
+        print("\n[3] Lifelog Counts (transcripts not fetched):")
+        print("-" * 60)
+        stats = analyze_lifelogs(lifelogs)
+        print(f"    Total lifelogs found:    {stats['total_lifelogs']}")
+        print_date_counts(stats['dates'])
+        print("-" * 60)
+        return
+
     # Step 3: Analyze what we're about to import
     print("\n[3] Analysis Summary:")
     print("-" * 60)
 
     stats = analyze_lifelogs(lifelogs)
 
+    # Lifelogs recorded in the import state are skipped in Step 5
+    already_imported = 0
+    to_import = stats['importable']
+    conversations = stats['total_conversations']
+    if state is not None:
+        existing = analyze_lifelogs([log for log in lifelogs if log.get("id") in state])
+        already_imported = existing['total_lifelogs']
+        to_import -= existing['importable']
+        conversations -= existing['total_conversations']
+
     print(f"    Total lifelogs found:    {stats['total_lifelogs']}")
     print(f"    Total transcript segments: {stats['total_segments']}")
     print(f"    Empty lifelogs (skip):   {stats['empty_count']}")
-    print(f"    Lifelogs to import:      {stats['importable']}")
+    if already_imported:
+        print(f"    Already imported (skip): {already_imported}")
+    print(f"    Lifelogs to import:      {to_import}")
     if stats['oversized_count'] > 0:
         print(f"    Oversized (will split):  {stats['oversized_count']}")
-        print(f"    Omi conversations:       {stats['total_conversations']}")
+        print(f"    Omi conversations:       {conversations}")
 
-    if stats['dates']:
-        print(f"\n    By date:")
-        for date in sorted(stats['dates'].keys()):
-            print(f"      {date}: {stats['dates'][date]} lifelogs")
+    print_date_counts(stats['dates'])
 
     # Estimate time with parallel processing
     effective_rate = min(args.workers * (60 / OMI_MIN_DELAY), OMI_REQUESTS_PER_MINUTE)
-    est_time_seconds = stats['total_conversations'] * (60 / effective_rate)
+    est_time_seconds = conversations * (60 / effective_rate)
     est_minutes = est_time_seconds / 60
     print(f"\n    Parallel workers:        {args.workers}")
     print(f"    Estimated import time:   {est_minutes:.1f} minutes")
@@ -518,7 +856,7 @@ API Keys:
         return
 
     if not args.yes:
-        print(f"\n[4] Ready to import {stats['importable']} lifelogs to Omi.")
+        print(f"\n[4] Ready to import {to_import} lifelogs to Omi.")
         confirm = input("    Continue? [y/N]: ").strip().lower()
         if confirm != 'y':
             print("    Cancelled.")
@@ -528,65 +866,215 @@ API Keys:
     print(f"\n[5] Importing to Omi ({args.workers} parallel workers)...")
     print("-" * 60)
 
-    total = len(lifelogs)
-    success = 0
-    failed = 0
-    skipped = 0
-    partial = 0
-    completed = 0
-    total_conversations = 0  # Track total Omi conversations created
     start_time = time.time()
 
-    # Prepare work items
-    work_items = [(i, log, omi) for i, log in enumerate(lifelogs)]
-
-    # Process in parallel with thread pool
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        # Submit all tasks
-        futures = {executor.submit(import_single_lifelog, item): item[0] for item in work_items}
-
-        # Process results as they complete
-        for future in as_completed(futures):
-            completed += 1
-            index, status, title, parts = future.result()
-
-            if status == "success":
-                success += 1
-                total_conversations += parts
-                status_char = "✓" if parts == 1 else f"✓({parts})"
-            elif status == "partial":
-                partial += 1
-                total_conversations += parts
-                status_char = f"~({parts})"
-            elif status == "failed":
-                failed += 1
-                status_char = "✗"
-            else:  # skipped
-                skipped += 1
-                status_char = "○"
-
-            print_progress_bar(completed, total, prefix="    Progress", suffix=f"{status_char} {title:<30}")
+    # Convert lazily here so upload workers only do network I/O
+    work_items = (prepare_import(i, log, state) for i, log in enumerate(lifelogs))
+    counts = tally_import_results(dispatch_imports(work_items, omi, args.workers, state), total=len(lifelogs))
 
     elapsed = time.time() - start_time
     print()  # New line after progress bar
     print("-" * 60)
 
     # Step 6: Final summary
+    print_import_summary(counts, elapsed)
+
+
+def stream_import(args, limitless, omi, dates, state=None):
+    """Upload lifelogs to Omi while they are still being fetched from Limitless"""
+    print(f"    Streaming {len(dates)} days of data (analysis skipped)...")
+
+    if not args.yes:
+        print(f"\n[4] Ready to import all lifelogs from {len(dates)} days to Omi.")
+        confirm = input("    Continue? [y/N]: ").strip().lower()
+        if confirm != 'y':
+            print("    Cancelled.")
+            return
+
+    print(f"\n[5] Importing to Omi ({args.workers} parallel workers)...")
+    print("-" * 60)
+
+    start_time = time.time()
+    work_items = stream_work_items(limitless, dates, args.timezone, maxsize=args.workers * 4, state=state)
+    counts = tally_import_results(dispatch_imports(work_items, omi, args.workers, state))
+
+    elapsed = time.time() - start_time
+    print()  # New line after progress counter
+    print("-" * 60)
+
+    print_import_summary(counts, elapsed)
+
+
+def dispatch_imports(work_items, omi_client, workers, state=None):
+    """Upload prepared lifelogs on a thread pool, yielding one result per lifelog as it completes.
+
+    Each payload is uploaded as its own task and at most ``workers * 2`` uploads are
+    in flight at once, so ``work_items`` can be a lazy stream without the pool
+    buffering all of it. Results are ``(index, status, title, parts)`` tuples.
+    Fully imported lifelogs are recorded in ``state`` when given.
+    """
+    max_pending = workers * 2
+    futures = {}  # Upload future -> lifelog index
+    outstanding = {}  # Lifelog index -> [lifelog id, title, total parts, parts remaining, Omi ids]
+
+    def collect(done):
+        for future in done:
+            index = futures.pop(future)
+            entry = outstanding[index]
+            entry[3] -= 1
+            result = future.result()
+            if result:
+                entry[4].append(result.get("id"))
+            if entry[3]:
+                continue
+
+            del outstanding[index]
+            lifelog_id, title, total_parts, _, omi_ids = entry
+            if len(omi_ids) == total_parts:
+                if state is not None and lifelog_id:
+                    state.record(lifelog_id, omi_ids)
+                yield (index, "success", title, total_parts)
+            elif omi_ids:
+                yield (index, "partial", title, len(omi_ids))
+            else:
+                yield (index, "failed", title, 0)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, lifelog_id, title, payloads in work_items:
+            if payloads is None:
+                yield (index, "existing", title, 0)
+                continue
+            if not payloads:
+                yield (index, "skipped", title, 0)
+                continue
+
+            outstanding[index] = [lifelog_id, title, len(payloads), len(payloads), []]
+            for payload in payloads:
+                futures[executor.submit(omi_client.create_conversation, payload)] = index
+
+                # Block only when the window is full; otherwise just report what has finished
+                timeout = None if len(futures) >= max_pending else 0
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            yield from collect(done)
+
+
+def stream_work_items(limitless, dates, timezone, maxsize, state=None):
+    """Fetch and convert lifelogs on a background thread, yielding work items as they are ready"""
+    work_queue = queue.Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            index = 0
+            for date in dates:
+                for log in limitless.iter_lifelogs(date=date, timezone=timezone, quiet=True):
+                    work_queue.put(prepare_import(index, log, state))
+                    index += 1
+        except Exception as exc:
+            work_queue.put(exc)  # Re-raised on the consumer side
+        else:
+            work_queue.put(None)  # Signal completion
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    while True:
+        item = work_queue.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+# Progress marker per import status (given the number of Omi conversations created)
+STATUS_CHAR = {
+    "success": lambda parts: "✓" if parts == 1 else f"✓({parts})",
+    "partial": lambda parts: f"~({parts})",
+    "failed": lambda parts: "✗",
+    "skipped": lambda parts: "○",
+    "existing": lambda parts: "=",
+}
+
+
+def tally_import_results(results, total=None):
+    """Count import results while showing progress (a counter when total is unknown)"""
+    counts = Counter()
+    progress = ProgressPrinter()
+
+    for index, status, title, parts in results:
+        counts["processed"] += 1
+        counts[status] += 1
+        counts["conversations"] += parts  # Zero for failed, skipped and existing
+        status_char = STATUS_CHAR[status](parts)
+
+        if total:
+            progress.update(counts["processed"], total, prefix="    Progress", suffix=f"{status_char} {title:<30}")
+        else:
+            progress.update(counts["processed"], prefix="    Processed", suffix=f"lifelogs {status_char} {title:<30}")
+
+    progress.flush()
+    return counts
+
+
+def print_import_summary(counts, elapsed):
+    """Print the final import summary (Step 6)"""
     print(f"\n[6] Import Complete!")
-    print(f"    Lifelogs processed:  {total}")
-    print(f"    Successful:          {success}")
-    if partial > 0:
-        print(f"    Partial:             {partial}")
-    print(f"    Failed:              {failed}")
-    print(f"    Skipped (empty):     {skipped}")
-    print(f"    Omi conversations:   {total_conversations}")
+    print(f"    Lifelogs processed:  {counts['processed']}")
+    print(f"    Successful:          {counts['success']}")
+    if counts["partial"] > 0:
+        print(f"    Partial:             {counts['partial']}")
+    print(f"    Failed:              {counts['failed']}")
+    print(f"    Skipped (empty):     {counts['skipped']}")
+    if counts["existing"] > 0:
+        print(f"    Already imported:    {counts['existing']}")
+    print(f"    Omi conversations:   {counts['conversations']}")
     print(f"    Time elapsed:        {elapsed/60:.1f} minutes")
-    if total_conversations > 0:
-        print(f"    Avg per conversation: {elapsed/total_conversations:.2f} seconds")
+    if counts["conversations"] > 0:
+        print(f"    Avg per conversation: {elapsed/counts['conversations']:.2f} seconds")
 
     print("\n" + "=" * 60)
     print("Done!")
 
 
+def main():
+    args = parse_args()
+
+    # Check if API keys are configured, prompt if not (replaying a cache needs no Limitless key)
+    need_limitless = not args.from_cache
+    if (need_limitless and not LIMITLESS_API_KEY) or not OMI_API_KEY:
+        prompt_for_api_keys(need_limitless)
+
+    # Cached days are only valid for the timezone they were fetched with
+    cache = LifelogCache(args.cache_dir, args.timezone) if args.save_cache or args.from_cache else None
+    if cache is not None:
+        saved_timezone = cache.saved_timezone()
+        if saved_timezone and saved_timezone != args.timezone:
+            print(f"Error: {args.cache_dir} holds lifelogs fetched with --timezone {saved_timezone}.")
+            print("       Use the same --timezone or a different --cache-dir.")
+            sys.exit(1)
+
+    # Previews don't touch the import state file
+    use_state = not (args.no_state or args.dry_run or args.count_only)
+    state = ImportState(args.state_file) if use_state else None
+
+    # Lifelogs come from the Limitless API, or from previously saved files
+    if args.from_cache:
+        source = cache
+    else:
+        source = LimitlessClient(LIMITLESS_API_KEY, pool_size=args.workers, cache=cache)
+
+    # Initialize clients (pooled connections are closed on exit)
+    try:
+        with source as limitless, \
+                OmiClient(OMI_API_KEY, pool_size=args.workers, burst=args.burst, http2=args.http2) as omi:
+            run_migration(args, limitless, omi, state)
+    finally:
+        if state is not None:
+            state.close()
+
+
 if __name__ == "__main__":
     main()